@@ -1,16 +1,22 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import hashlib
 import json
 import pathlib
+import sqlite3
+import threading
 import time
 import re
 from typing import Any, Dict, Iterable, List, Optional
 
 try:
-    from openai import OpenAI  # type: ignore
+    import httpx  # type: ignore
+    from openai import AsyncOpenAI  # type: ignore
 except Exception:  # pragma: no cover - optional at import time
-    OpenAI = None  # type: ignore
+    httpx = None  # type: ignore
+    AsyncOpenAI = None  # type: ignore
 
 try:
     from tqdm import tqdm  # type: ignore
@@ -18,6 +24,26 @@ except Exception:  # pragma: no cover - allow --help without tqdm installed
     def tqdm(x, **kwargs):
         return x
 
+try:
+    import tiktoken  # type: ignore
+except Exception:  # pragma: no cover - optional, falls back to chars//4
+    tiktoken = None  # type: ignore
+
+try:
+    import ijson  # type: ignore
+except Exception:  # pragma: no cover - optional, falls back to json.load
+    ijson = None  # type: ignore
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional, pure-Python fallback
+    np = None  # type: ignore
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional, stdlib json fallback
+    orjson = None  # type: ignore
+
 from tools.impl import (
     ctgov_search,
     oncology_path_query,
@@ -29,7 +55,7 @@ from tools.impl import (
     umls_cui_to_name,
     umls_get_related,
 )
-from tools.schema import ALL_SCHEMAS
+from tools.schema import TOOLS_PAYLOAD
 
 
 SYSTEM_PROMPT = (
@@ -38,6 +64,185 @@ SYSTEM_PROMPT = (
 )
 
 
+class RateLimiter:
+    """Leaky-bucket limiter for request and token throughput.
+
+    Tracks available request/token capacity, refilled continuously at
+    max_rpm/60 and max_tpm/60 per second; acquire() sleeps until both
+    buckets cover the estimated cost. A limit of 0 means unbounded.
+    """
+
+    def __init__(self, max_rpm: float = 0, max_tpm: float = 0) -> None:
+        self.max_rpm = max_rpm
+        self.max_tpm = max_tpm
+        self._request_capacity = float(max_rpm)
+        self._token_capacity = float(max_tpm)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self.max_rpm:
+            self._request_capacity = min(
+                self.max_rpm, self._request_capacity + self.max_rpm * elapsed / 60.0
+            )
+        if self.max_tpm:
+            self._token_capacity = min(
+                self.max_tpm, self._token_capacity + self.max_tpm * elapsed / 60.0
+            )
+
+    async def acquire(self, tokens: int) -> None:
+        if not self.max_rpm and not self.max_tpm:
+            return
+        while True:
+            async with self._lock:
+                self._refill()
+                if (not self.max_rpm or self._request_capacity >= 1) and (
+                    not self.max_tpm or self._token_capacity >= tokens
+                ):
+                    if self.max_rpm:
+                        self._request_capacity -= 1
+                    if self.max_tpm:
+                        self._token_capacity -= tokens
+                    return
+            await asyncio.sleep(1.0)
+
+
+class ChatCache:
+    """Content-addressed cache for chat completions, backed by sqlite.
+
+    Keys are the sha256 of the full request kwargs (model, temperature,
+    messages, ...), so identical prompts are never re-paid even if the
+    dataset is edited or reordered between runs.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, response TEXT)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(kwargs: Dict[str, Any]) -> str:
+        payload = json.dumps(kwargs, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, response: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response) VALUES (?, ?)",
+                (key, response),
+            )
+            self._conn.commit()
+
+
+async def cached_chat(
+    client: Any,
+    cache: Optional[ChatCache],
+    limiter: "RateLimiter | None" = None,
+    **kwargs: Any,
+) -> str:
+    """Call chat.completions.create, serving repeats from the disk cache.
+
+    The rate limiter is only consulted on a cache miss, so cached items
+    cost neither tokens nor bucket capacity.
+    """
+    if cache is not None:
+        key = ChatCache.key_for(kwargs)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    if limiter is not None:
+        budget = kwargs.get("max_tokens", 512)
+        await limiter.acquire(_estimate_tokens(json.dumps(kwargs.get("messages", [])), kwargs.get("model", ""), completion_budget=budget))
+    resp = await client.chat.completions.create(**kwargs)
+    content = (resp.choices[0].message.content or "").strip()
+    if cache is not None:
+        cache.put(key, content)
+    return content
+
+
+class SemanticCache:
+    """FAISS-backed cache that reuses answers for near-duplicate questions.
+
+    Questions are embedded with sentence-transformers and matched by inner
+    product on normalized vectors (= cosine similarity); a hit above the
+    threshold reuses the stored answer instead of calling the API. Both
+    the index and the answer list are persisted under out_dir.
+    """
+
+    def __init__(self, out_dir: pathlib.Path, threshold: float = 0.95) -> None:
+        try:
+            import faiss  # type: ignore
+            from sentence_transformers import SentenceTransformer  # type: ignore
+        except Exception as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "--semantic-cache requires 'faiss-cpu' and 'sentence-transformers'"
+            ) from exc
+
+        self._faiss = faiss
+        self.threshold = threshold
+        self._model = SentenceTransformer("all-MiniLM-L6-v2")
+        self._index_path = out_dir / "sem_cache.faiss"
+        self._answers_path = out_dir / "sem_cache_answers.json"
+        self._lock = threading.Lock()
+
+        if self._index_path.exists() and self._answers_path.exists():
+            self._index = faiss.read_index(str(self._index_path))
+            self._answers: List[str] = json.loads(
+                self._answers_path.read_text(encoding="utf-8")
+            )
+        else:
+            dim = self._model.get_sentence_embedding_dimension()
+            self._index = faiss.IndexFlatIP(dim)
+            self._answers = []
+
+    def encode(self, question: str) -> Any:
+        return self._model.encode(question, normalize_embeddings=True)
+
+    def search(self, emb: Any) -> Optional[str]:
+        with self._lock:
+            if self._index.ntotal == 0:
+                return None
+            scores, ids = self._index.search(emb[None, :], 1)
+        if scores[0, 0] > self.threshold:
+            return self._answers[int(ids[0, 0])]
+        return None
+
+    def add(self, emb: Any, answer: str) -> None:
+        with self._lock:
+            self._index.add(emb[None, :])
+            self._answers.append(answer)
+
+    def save(self) -> None:
+        with self._lock:
+            self._faiss.write_index(self._index, str(self._index_path))
+            self._answers_path.write_text(
+                json.dumps(self._answers, ensure_ascii=False), encoding="utf-8"
+            )
+
+
+def _estimate_tokens(text: str, model: str, completion_budget: int = 512) -> int:
+    if tiktoken is not None:
+        try:
+            enc = tiktoken.encoding_for_model(model)
+        except Exception:
+            enc = tiktoken.get_encoding("cl100k_base")
+        return len(enc.encode(text)) + completion_budget
+    return len(text) // 4 + completion_budget
+
+
 TOOL_FUNCTIONS = {
     "pubmed.search": pubmed_search,
     "ctgov.search": ctgov_search,
@@ -73,7 +278,7 @@ def _invoke_tool(tool_name: str, arguments: Dict[str, Any]) -> str:
         return _normalize_tool_result({"error": f"{type(exc).__name__}: {exc}"})
 
 
-def _tool_messages_from_response(message: Any) -> List[Dict[str, Any]]:
+async def _tool_messages_from_response(message: Any) -> List[Dict[str, Any]]:
     tool_messages: List[Dict[str, Any]] = []
     for tool_call in getattr(message, "tool_calls", None) or []:
         function_call = tool_call.function
@@ -81,22 +286,25 @@ def _tool_messages_from_response(message: Any) -> List[Dict[str, Any]]:
             arguments = json.loads(function_call.arguments) if function_call.arguments else {}
         except Exception:
             arguments = {}
+        # Tool implementations are blocking (requests/pymysql); run off-loop.
+        content = await asyncio.to_thread(_invoke_tool, function_call.name, arguments)
         tool_messages.append(
             {
                 "role": "tool",
                 "tool_call_id": tool_call.id,
-                "content": _invoke_tool(function_call.name, arguments),
+                "content": content,
             }
         )
     return tool_messages
 
 
-def _generate_answer_with_tools(
+async def _generate_answer_with_tools(
     client: Any,
     model: str,
     question: str,
     temperature: float,
     max_tool_rounds: int,
+    limiter: "RateLimiter | None" = None,
 ) -> str:
     messages: List[Dict[str, Any]] = [
         {"role": "system", "content": SYSTEM_PROMPT},
@@ -104,11 +312,13 @@ def _generate_answer_with_tools(
     ]
 
     for _ in range(max_tool_rounds):
-        resp = client.chat.completions.create(
+        if limiter is not None:
+            await limiter.acquire(_estimate_tokens(json.dumps(messages), model))
+        resp = await client.chat.completions.create(
             model=model,
             temperature=temperature,
             messages=messages,
-            tools=ALL_SCHEMAS,
+            tools=TOOLS_PAYLOAD,
             tool_choice="auto",
         )
         message = resp.choices[0].message
@@ -130,9 +340,11 @@ def _generate_answer_with_tools(
             for tool_call in tool_calls
         ]
         messages.append(assistant_message)
-        messages.extend(_tool_messages_from_response(message))
+        messages.extend(await _tool_messages_from_response(message))
 
-    resp = client.chat.completions.create(
+    if limiter is not None:
+        await limiter.acquire(_estimate_tokens(json.dumps(messages), model))
+    resp = await client.chat.completions.create(
         model=model,
         temperature=temperature,
         messages=messages,
@@ -143,10 +355,29 @@ def _generate_answer_with_tools(
 def load_items(path: pathlib.Path) -> List[Dict[str, Any]]:
     """Load MAIA items from a JSON file.
 
-    Accepts either a list of QA dicts or a dict with key 'dataset'.
+    Accepts either a list of QA dicts or a dict with key 'dataset'. When
+    ijson is available the file is stream-parsed and only the fields the
+    pipeline reads (question/answer) are kept, so peak memory is bounded
+    by the lean item list rather than the fully parsed document.
     """
-    with path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    if ijson is not None:
+        with path.open("rb") as f:
+            first = f.read(64).lstrip()[:1]
+            f.seek(0)
+            prefix = "item" if first == b"[" else "dataset.item"
+            items = [
+                {"question": obj.get("question", ""), "answer": obj.get("answer", "")}
+                for obj in ijson.items(f, prefix)
+            ]
+        if items or first == b"[":
+            return items
+        raise ValueError("Unsupported dataset format; expected list or {'dataset': [...]}")
+
+    if orjson is not None:
+        data = orjson.loads(path.read_bytes())
+    else:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
     if isinstance(data, dict) and "dataset" in data:
         return data["dataset"]
     if isinstance(data, list):
@@ -158,11 +389,58 @@ def ensure_dir(p: pathlib.Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 
+def _json_dumps(obj: Any) -> str:
+    """Compact dump via orjson's C serializer when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _json_loads(data: "str | bytes") -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _load_checkpoint(out_path: pathlib.Path) -> Dict[str, Any]:
+    """Rebuild the idx->value dict from the final JSON plus the JSONL log.
+
+    The JSONL log is append-only and may be newer than the last full JSON
+    dump, so its records win on conflict.
+    """
+    records: Dict[str, Any] = {}
+    if out_path.exists():
+        try:
+            records = _json_loads(out_path.read_bytes())
+        except Exception:
+            records = {}
+    jsonl_path = out_path.with_suffix(".jsonl")
+    if jsonl_path.exists():
+        with jsonl_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = _json_loads(line)
+                    records[str(rec["idx"])] = rec["value"]
+                except Exception:
+                    continue
+    return records
+
+
+def _append_checkpoint(f: Any, idx: int, value: Any) -> None:
+    f.write(_json_dumps({"idx": idx, "value": value}) + "\n")
+
+
 def save_json(obj: Any, path: pathlib.Path) -> None:
-    path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
-def generate_answers(
+async def generate_answers(
     items: List[Dict[str, Any]],
     client: Any,
     model: str,
@@ -173,64 +451,81 @@ def generate_answers(
     end: int | None = None,
     use_tools: bool = False,
     max_tool_rounds: int = 4,
+    concurrency: int = 8,
+    limiter: RateLimiter | None = None,
+    cache: ChatCache | None = None,
+    sem_cache: SemanticCache | None = None,
 ) -> Dict[str, str]:
     """Generate model answers for the given slice of items.
 
-    Returns a dict mapping string index to answer text and persists to out_path.
+    Dispatches up to `concurrency` requests in flight at once and returns a
+    dict mapping string index to answer text, persisted to out_path.
     """
-    # resume if exists
-    if out_path.exists():
-        try:
-            model_answers: Dict[str, str] = json.loads(out_path.read_text(encoding="utf-8"))
-        except Exception:
-            model_answers = {}
-    else:
-        model_answers = {}
+    # resume from previous runs (final JSON + append-only log)
+    model_answers: Dict[str, str] = _load_checkpoint(out_path)
 
     rng = range(start, len(items) if end is None else min(end, len(items)))
-    for idx in tqdm(rng, desc="Generating answers"):
-        if str(idx) in model_answers:
-            continue
+    pending = [idx for idx in rng if str(idx) not in model_answers]
+    sem = asyncio.Semaphore(concurrency)
+    ckpt = out_path.with_suffix(".jsonl").open("a", encoding="utf-8", buffering=1)
 
+    async def _one(idx: int) -> None:
         q = items[idx]["question"]
-        try:
-            if use_tools:
-                answer = _generate_answer_with_tools(
-                    client=client,
-                    model=model,
-                    question=q,
-                    temperature=temperature,
-                    max_tool_rounds=max_tool_rounds,
-                )
-            else:
-                resp = client.chat.completions.create(
-                    model=model,
-                    temperature=temperature,
-                    messages=[
-                        {"role": "system", "content": SYSTEM_PROMPT},
-                        {"role": "user", "content": q},
-                    ],
-                )
-                answer = (resp.choices[0].message.content or "").strip()
-            model_answers[str(idx)] = answer
-            time.sleep(rate_limit_s)
-        except Exception as e:
-            print(f"[Responder error @ {idx}] {e}. Retrying in 10 s…")
-            time.sleep(10)
-            continue
-
-        if idx % 10 == 9:
-            save_json(model_answers, out_path)
+        async with sem:
+            try:
+                emb = None
+                if sem_cache is not None:
+                    emb = await asyncio.to_thread(sem_cache.encode, q)
+                    hit = sem_cache.search(emb)
+                    if hit is not None:
+                        model_answers[str(idx)] = hit
+                        _append_checkpoint(ckpt, idx, hit)
+                        return
+                if use_tools:
+                    answer = await _generate_answer_with_tools(
+                        client=client,
+                        model=model,
+                        question=q,
+                        temperature=temperature,
+                        max_tool_rounds=max_tool_rounds,
+                        limiter=limiter,
+                    )
+                else:
+                    answer = await cached_chat(
+                        client,
+                        cache,
+                        limiter=limiter,
+                        model=model,
+                        temperature=temperature,
+                        messages=[
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": q},
+                        ],
+                    )
+                model_answers[str(idx)] = answer
+                _append_checkpoint(ckpt, idx, answer)
+                if emb is not None:
+                    sem_cache.add(emb, answer)
+                if rate_limit_s:
+                    await asyncio.sleep(rate_limit_s)
+            except Exception as e:
+                print(f"[Responder error @ {idx}] {e}. Item left for next run.")
+                return
 
+    try:
+        tasks = [asyncio.ensure_future(_one(idx)) for idx in pending]
+        for fut in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Generating answers"):
+            await fut
+    finally:
+        ckpt.close()
+
+    if sem_cache is not None:
+        sem_cache.save()
     save_json(model_answers, out_path)
     return model_answers
 
 
-JUDGE_PROMPT_TPL = """You are an impartial medical board examiner.
-Score the model answer against the reference answer on a 0–5 scale.
-If unsure between two scores, pick the lower one.
-
-Rubric:
+_JUDGE_RUBRIC = """Rubric:
 5 = Covers all key clinical facts; any extra content is correct & relevant.
 4 = ≥90% key facts correct; at most one minor omission or wording issue.
 3 = 70–89% key facts covered; may include a few minor errors; none unsafe.
@@ -241,7 +536,14 @@ Rubric:
 Penalty rules:
 • Extra correct & relevant content → no penalty.
 • Extra irrelevant or wrong content → lower the score.
-• Any unsafe or potentially harmful statement → max score = 1.
+• Any unsafe or potentially harmful statement → max score = 1."""
+
+
+JUDGE_PROMPT_TPL = """You are an impartial medical board examiner.
+Score the model answer against the reference answer on a 0–5 scale.
+If unsure between two scores, pick the lower one.
+
+""" + _JUDGE_RUBRIC + """
 
 Return exactly one line:
 "<score 0-5>: <concise 1–2 sentence justification>"
@@ -257,7 +559,51 @@ Model answer:
 """
 
 
-def judge_answers(
+JUDGE_GROUP_PROMPT_TPL = """You are an impartial medical board examiner.
+Score each model answer against its reference answer on a 0–5 scale.
+If unsure between two scores, pick the lower one.
+
+""" + _JUDGE_RUBRIC + """
+
+The input below is a JSON array of items, each with "question",
+"ref_answer" and "model_answer". Return a JSON object of the form
+{{"scores": [{{"score": <0-5>, "explanation": "<concise 1–2 sentences>"}}, ...]}}
+with exactly one entry per input item, in the same order.
+
+Items:
+{items_json}
+"""
+
+
+_SCORE_RE = re.compile(r"\b([0-5](?:\.\d+)?)\b")
+
+
+def _parse_score(raw: str) -> Optional[float]:
+    """Extract the 0-5 score from a judge reply.
+
+    The judge is instructed to answer "<score>: <justification>", so the
+    text before the first colon parses as a float in almost every case;
+    only malformed replies fall back to the regex scan.
+    """
+    head = raw.partition(":")[0].strip()
+    try:
+        score = float(head)
+        if 0 <= score <= 5:
+            return score
+    except ValueError:
+        pass
+    m = _SCORE_RE.search(raw)
+    return float(m.group(1)) if m else None
+
+
+def _ref_answer_str(item: Dict[str, Any]) -> str:
+    ref_answer = item.get("answer", "")
+    if isinstance(ref_answer, list):
+        return ", ".join(map(str, ref_answer))
+    return str(ref_answer)
+
+
+async def judge_answers(
     items: List[Dict[str, Any]],
     client: Any,
     model: str,
@@ -266,73 +612,234 @@ def judge_answers(
     out_path: pathlib.Path,
     start: int = 0,
     end: int | None = None,
+    concurrency: int = 8,
+    limiter: RateLimiter | None = None,
+    cache: ChatCache | None = None,
+    group_size: int = 5,
 ) -> Dict[str, Dict[str, Any]]:
     """Score model answers and persist to out_path.
 
+    Items are judged `group_size` at a time in a single request (amortizing
+    the rubric and per-request overhead against the RPM limit), falling back
+    to per-item calls when the grouped JSON response cannot be parsed.
     Returns a dict mapping index str to {score, explanation}.
     """
-    if out_path.exists():
-        try:
-            judge_scores: Dict[str, Dict[str, Any]] = json.loads(out_path.read_text(encoding="utf-8"))
-        except Exception:
-            judge_scores = {}
-    else:
-        judge_scores = {}
+    judge_scores: Dict[str, Dict[str, Any]] = _load_checkpoint(out_path)
 
     rng = range(start, len(items) if end is None else min(end, len(items)))
-    for idx in tqdm(rng, desc="Judging answers"):
-        if str(idx) in judge_scores:
-            continue
-
-        ref_answer = items[idx].get("answer", "")
-        if isinstance(ref_answer, list):
-            ref_answer_str = ", ".join(map(str, ref_answer))
-        else:
-            ref_answer_str = str(ref_answer)
+    pending = [idx for idx in rng if str(idx) not in judge_scores]
+    sem = asyncio.Semaphore(concurrency)
+    group_size = max(1, group_size)
+    ckpt = out_path.with_suffix(".jsonl").open("a", encoding="utf-8", buffering=1)
 
+    async def _score_one(idx: int) -> None:
         prompt = JUDGE_PROMPT_TPL.format(
             question=items[idx]["question"],
-            ref_answer=ref_answer_str,
+            ref_answer=_ref_answer_str(items[idx]),
             model_answer=answers.get(str(idx), ""),
         )
+        raw = await cached_chat(
+            client,
+            cache,
+            limiter=limiter,
+            model=model,
+            temperature=0,
+            max_tokens=120,
+            messages=[
+                {"role": "system", "content": "You are an expert clinical examiner."},
+                {"role": "user", "content": prompt},
+            ],
+        )
 
-        try:
-            resp = client.chat.completions.create(
-                model=model,
-                temperature=0,
-                max_tokens=120,
-                messages=[
-                    {"role": "system", "content": "You are an expert clinical examiner."},
-                    {"role": "user", "content": prompt},
-                ],
+        score = _parse_score(raw)
+        if score is None:
+            print(f"[Judge format error @ {idx}] {raw}")
+            return
+
+        judge_scores[str(idx)] = {"score": score, "explanation": raw}
+        _append_checkpoint(ckpt, idx, judge_scores[str(idx)])
+
+    async def _score_group(idxs: List[int]) -> None:
+        payload = [
+            {
+                "question": items[idx]["question"],
+                "ref_answer": _ref_answer_str(items[idx]),
+                "model_answer": answers.get(str(idx), ""),
+            }
+            for idx in idxs
+        ]
+        prompt = JUDGE_GROUP_PROMPT_TPL.format(
+            items_json=json.dumps(payload, ensure_ascii=False)
+        )
+        raw = await cached_chat(
+            client,
+            cache,
+            limiter=limiter,
+            model=model,
+            temperature=0,
+            max_tokens=120 * len(idxs),
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": "You are an expert clinical examiner."},
+                {"role": "user", "content": prompt},
+            ],
+        )
+
+        scores = json.loads(raw)["scores"]
+        if not isinstance(scores, list) or len(scores) != len(idxs):
+            raise ValueError(f"expected {len(idxs)} scores, got {scores!r}")
+        for idx, entry in zip(idxs, scores):
+            score = float(entry["score"])
+            if not 0 <= score <= 5:
+                raise ValueError(f"score out of range: {entry!r}")
+            judge_scores[str(idx)] = {
+                "score": score,
+                "explanation": str(entry.get("explanation", "")),
+            }
+            _append_checkpoint(ckpt, idx, judge_scores[str(idx)])
+
+    async def _one(idxs: List[int]) -> None:
+        async with sem:
+            try:
+                if len(idxs) > 1:
+                    try:
+                        await _score_group(idxs)
+                    except Exception as e:
+                        print(f"[Judge group error @ {idxs[0]}-{idxs[-1]}] {e}. Falling back to per-item calls.")
+                        for idx in idxs:
+                            await _score_one(idx)
+                else:
+                    await _score_one(idxs[0])
+                if rate_limit_s:
+                    await asyncio.sleep(rate_limit_s)
+            except Exception as e:
+                print(f"[Judge error @ {idxs[0]}] {e}. Items left for next run.")
+                return
+
+    try:
+        groups = [pending[i:i + group_size] for i in range(0, len(pending), group_size)]
+        tasks = [asyncio.ensure_future(_one(g)) for g in groups]
+        for fut in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Judging answers"):
+            await fut
+    finally:
+        ckpt.close()
+
+    save_json(judge_scores, out_path)
+    return judge_scores
+
+
+async def judge_answers_batch(
+    items: List[Dict[str, Any]],
+    client: Any,
+    model: str,
+    answers: Dict[str, str],
+    out_path: pathlib.Path,
+    start: int = 0,
+    end: int | None = None,
+    poll_interval_s: float = 30.0,
+) -> Dict[str, Dict[str, Any]]:
+    """Score model answers via the OpenAI Batch API.
+
+    The judge phase is latency-insensitive and deterministic, so all
+    pending items are uploaded as one JSONL batch (~50% token cost, no
+    per-minute rate limits) and polled until completion.
+    """
+    judge_scores: Dict[str, Dict[str, Any]] = _load_checkpoint(out_path)
+
+    rng = range(start, len(items) if end is None else min(end, len(items)))
+    pending = [idx for idx in rng if str(idx) not in judge_scores]
+    if not pending:
+        save_json(judge_scores, out_path)
+        return judge_scores
+
+    input_path = out_path.with_suffix(".batch_input.jsonl")
+    with input_path.open("w", encoding="utf-8") as f:
+        for idx in pending:
+            prompt = JUDGE_PROMPT_TPL.format(
+                question=items[idx]["question"],
+                ref_answer=_ref_answer_str(items[idx]),
+                model_answer=answers.get(str(idx), ""),
             )
-            raw = resp.choices[0].message.content.strip()
-
-            m = re.search(r"\b([0-5](?:\.\d+)?)\b", raw)
-            if not m:
-                print(f"[Judge format error @ {idx}] {raw}")
-                continue
-
-            score = float(m.group(1))
-            judge_scores[str(idx)] = {"score": score, "explanation": raw}
-            time.sleep(rate_limit_s)
-        except Exception as e:
-            print(f"[Judge error @ {idx}] {e}. Retrying in 5 s…")
-            time.sleep(5)
+            line = {
+                "custom_id": str(idx),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model,
+                    "temperature": 0,
+                    "max_tokens": 120,
+                    "messages": [
+                        {"role": "system", "content": "You are an expert clinical examiner."},
+                        {"role": "user", "content": prompt},
+                    ],
+                },
+            }
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    with input_path.open("rb") as f:
+        batch_file = await client.files.create(file=f, purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"Submitted batch {batch.id} with {len(pending)} items")
+
+    while True:
+        batch = await client.batches.retrieve(batch.id)
+        if batch.status == "completed":
+            break
+        if batch.status in ("failed", "expired", "cancelled"):
+            raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+        await asyncio.sleep(poll_interval_s)
+
+    output = await client.files.content(batch.output_file_id)
+    for line in output.text.splitlines():
+        if not line.strip():
             continue
-
-        if idx % 10 == 9:
-            save_json(judge_scores, out_path)
+        rec = json.loads(line)
+        idx = rec["custom_id"]
+        body = (rec.get("response") or {}).get("body") or {}
+        choices = body.get("choices") or []
+        if not choices:
+            print(f"[Judge batch error @ {idx}] {rec.get('error')}")
+            continue
+        raw = (choices[0]["message"]["content"] or "").strip()
+        score = _parse_score(raw)
+        if score is None:
+            print(f"[Judge format error @ {idx}] {raw}")
+            continue
+        judge_scores[idx] = {"score": score, "explanation": raw}
 
     save_json(judge_scores, out_path)
     return judge_scores
 
 
+def _score_values(scores: Dict[str, Dict[str, Any]]) -> Iterable[float]:
+    return (v["score"] for v in scores.values() if isinstance(v, dict) and "score" in v)
+
+
 def mean_score(scores: Dict[str, Dict[str, Any]]) -> float:
-    vals = [v["score"] for v in scores.values() if isinstance(v, dict) and "score" in v]
+    if np is not None:
+        arr = np.fromiter(_score_values(scores), dtype=np.float32)
+        return float(arr.mean()) if arr.size else 0.0
+    vals = list(_score_values(scores))
     return sum(vals) / len(vals) if vals else 0.0
 
 
+def score_distribution(scores: Dict[str, Dict[str, Any]]) -> List[int]:
+    """Histogram of scores truncated to the integer buckets 0-5."""
+    if np is not None:
+        arr = np.fromiter(_score_values(scores), dtype=np.float32)
+        if not arr.size:
+            return [0] * 6
+        return np.bincount(arr.astype(np.int64).clip(0, 5), minlength=6).tolist()
+    dist = [0] * 6
+    for v in _score_values(scores):
+        dist[min(max(int(v), 0), 5)] += 1
+    return dist
+
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Evaluate MAIA model answers with an LLM judge.")
     p.add_argument("--input", default="dataset/MAIA.json", help="Path to dataset JSON")
@@ -343,57 +850,102 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--rate-limit-s", type=float, default=1.0, help="Delay between API calls in seconds")
     p.add_argument("--start", type=int, default=0, help="Start index (inclusive)")
     p.add_argument("--end", type=int, default=None, help="End index (exclusive)")
+    p.add_argument("--concurrency", type=int, default=8, help="Maximum concurrent API requests")
+    p.add_argument("--max-rpm", type=float, default=0, help="Requests-per-minute ceiling (0 = unlimited)")
+    p.add_argument("--max-tpm", type=float, default=0, help="Tokens-per-minute ceiling (0 = unlimited)")
+    p.add_argument("--no-llm-cache", action="store_true", help="Disable the on-disk chat completion cache")
+    p.add_argument("--semantic-cache", action="store_true", help="Reuse answers for near-duplicate questions (requires faiss + sentence-transformers)")
+    p.add_argument("--semantic-threshold", type=float, default=0.95, help="Cosine similarity threshold for semantic cache hits")
     p.add_argument("--use-tools", action="store_true", help="Enable tool calling with ALL_SCHEMAS")
     p.add_argument("--max-tool-rounds", type=int, default=4, help="Maximum tool-calling rounds per item")
+    p.add_argument("--judge-mode", choices=["sync", "batch"], default="sync", help="Judge via live calls or the OpenAI Batch API")
+    p.add_argument("--judge-group-size", type=int, default=5, help="Items judged per request in sync mode (1 = one call per item)")
     p.add_argument("--skip-generate", action="store_true", help="Skip answer generation phase")
     p.add_argument("--skip-judge", action="store_true", help="Skip judge phase")
     return p.parse_args()
 
 
-def main() -> None:
-    args = parse_args()
+async def _amain(args: argparse.Namespace) -> None:
     in_path = pathlib.Path(args.input)
     out_dir = pathlib.Path(args.outdir)
     ensure_dir(out_dir)
 
     items = load_items(in_path)
-    if OpenAI is None:
+    if AsyncOpenAI is None:
         raise RuntimeError("openai package not installed. Please `pip install openai`.")
-    client = OpenAI()
+    # One client (and one keep-alive connection pool) shared by both phases;
+    # each item reuses warm TLS connections instead of re-handshaking.
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=args.concurrency * 2,
+            max_keepalive_connections=args.concurrency,
+        )
+    )
+    client = AsyncOpenAI(http_client=http_client)
+    limiter = RateLimiter(max_rpm=args.max_rpm, max_tpm=args.max_tpm)
+    cache = None if args.no_llm_cache else ChatCache(out_dir / ".llm_cache.sqlite3")
+    sem_cache = SemanticCache(out_dir, threshold=args.semantic_threshold) if args.semantic_cache else None
 
     answers_path = out_dir / "model_answers.json"
     scores_path = out_dir / "judge_scores.json"
 
-    if not args.skip_generate:
-        answers = generate_answers(
-            items=items,
-            client=client,
-            model=args.responder_model,
-            temperature=args.temperature,
-            rate_limit_s=args.rate_limit_s,
-            out_path=answers_path,
-            start=args.start,
-            end=args.end,
-            use_tools=args.use_tools,
-            max_tool_rounds=args.max_tool_rounds,
-        )
-    else:
-        answers = json.loads(answers_path.read_text(encoding="utf-8")) if answers_path.exists() else {}
-
-    if not args.skip_judge:
-        scores = judge_answers(
-            items=items,
-            client=client,
-            model=args.judge_model,
-            rate_limit_s=args.rate_limit_s,
-            answers=answers,
-            out_path=scores_path,
-            start=args.start,
-            end=args.end,
-        )
-        print(f"Average score: {mean_score(scores):.3f} over {len(scores)} items")
-    else:
-        print("Judge phase skipped.")
+    try:
+        if not args.skip_generate:
+            answers = await generate_answers(
+                items=items,
+                client=client,
+                model=args.responder_model,
+                temperature=args.temperature,
+                rate_limit_s=args.rate_limit_s,
+                out_path=answers_path,
+                start=args.start,
+                end=args.end,
+                use_tools=args.use_tools,
+                max_tool_rounds=args.max_tool_rounds,
+                concurrency=args.concurrency,
+                limiter=limiter,
+                cache=cache,
+                sem_cache=sem_cache,
+            )
+        else:
+            answers = _load_checkpoint(answers_path)
+
+        if not args.skip_judge:
+            if args.judge_mode == "batch":
+                scores = await judge_answers_batch(
+                    items=items,
+                    client=client,
+                    model=args.judge_model,
+                    answers=answers,
+                    out_path=scores_path,
+                    start=args.start,
+                    end=args.end,
+                )
+            else:
+                scores = await judge_answers(
+                    items=items,
+                    client=client,
+                    model=args.judge_model,
+                    rate_limit_s=args.rate_limit_s,
+                    answers=answers,
+                    out_path=scores_path,
+                    start=args.start,
+                    end=args.end,
+                    concurrency=args.concurrency,
+                    limiter=limiter,
+                    cache=cache,
+                    group_size=args.judge_group_size,
+                )
+            print(f"Average score: {mean_score(scores):.3f} over {len(scores)} items")
+            print(f"Score distribution (0-5): {score_distribution(scores)}")
+        else:
+            print("Judge phase skipped.")
+    finally:
+        await client.close()
+
+
+def main() -> None:
+    asyncio.run(_amain(parse_args()))
 
 
 if __name__ == "__main__":
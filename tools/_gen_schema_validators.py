@@ -0,0 +1,71 @@
+# tools/_gen_schema_validators.py
+# Build-time generator: emits tools/_schema_validators.py with one
+# straight-line validate_<name>() function per schema, produced by
+# fastjsonschema.compile_to_code. Importing the generated file replaces
+# the per-process "compile every schema" step in tools/schema.py with a
+# plain module import. Run after editing any schema:
+#
+#     python -m tools._gen_schema_validators
+#
+import re
+import sys
+from pathlib import Path
+
+from .schema import ALL_SCHEMAS, to_plain
+
+_OUT = Path(__file__).with_name("_schema_validators.py")
+
+# Per-schema boilerplate emitted by compile_to_code; hoisted once into
+# the generated module's header instead of repeated per function.
+_BOILERPLATE = re.compile(
+    r"^(VERSION = .*|import re|from fastjsonschema import .*|NoneType = type\(None\))$",
+    re.M,
+)
+
+_HEADER = '''\
+# Generated by tools/_gen_schema_validators.py — DO NOT EDIT.
+# Regenerate with: python -m tools._gen_schema_validators
+import re
+
+from fastjsonschema import JsonSchemaValueException
+
+NoneType = type(None)
+'''
+
+
+def _slug(name):
+    return re.sub(r"[^0-9A-Za-z]+", "_", name).strip("_").lower()
+
+
+def main():
+    try:
+        import fastjsonschema
+    except ImportError:  # pragma: no cover - build-time dependency
+        sys.exit("fastjsonschema is required to generate validators: pip install fastjsonschema")
+
+    parts = [_HEADER]
+    names = {}  # schema name -> generated function name
+    by_params = {}  # id(parameters) -> function name; aliases share code
+    for schema in ALL_SCHEMAS:
+        slug = _slug(schema["name"])
+        pid = id(schema["parameters"])
+        if pid in by_params:
+            parts.append(f"validate_{slug} = validate_{by_params[pid]}\n")
+            names[schema["name"]] = f"validate_{slug}"
+            continue
+        by_params[pid] = slug
+        code = fastjsonschema.compile_to_code(to_plain(schema["parameters"]))
+        code = _BOILERPLATE.sub("", code)
+        code = code.replace("REGEX_PATTERNS", f"_REGEX_{slug}")
+        code = code.replace("def validate(", f"def validate_{slug}(", 1)
+        parts.append(code.strip() + "\n")
+        names[schema["name"]] = f"validate_{slug}"
+
+    mapping = "\n".join(f'    "{n}": {f},' for n, f in names.items())
+    parts.append(f"VALIDATORS = {{\n{mapping}\n}}\n")
+    _OUT.write_text("\n\n".join(parts), encoding="utf-8")
+    print(f"wrote {_OUT} ({len(names)} validators)")
+
+
+if __name__ == "__main__":
+    main()
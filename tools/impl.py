@@ -1,24 +1,49 @@
 # tools/impl.py
 from __future__ import annotations
+import functools
 import os
+from contextlib import contextmanager
 import json
 import re
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 try:
     import pymysql  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
     pymysql = None  # type: ignore
+try:
+    from dbutils.pooled_db import PooledDB  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    PooledDB = None  # type: ignore
+try:
+    import httpx  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    httpx = None  # type: ignore
+
+# Shared session: keep-alive connection pool + retries for all HTTP tools,
+# so repeated calls reuse warm TCP/TLS connections instead of re-handshaking.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+    ),
+)
 # ───────────────────────────────────────────
 # 1) PubMed
 # ───────────────────────────────────────────
 PUBMED = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
 
+@functools.lru_cache(maxsize=4096)
 def pubmed_search(term: str, retmax: int = 10) -> List[str]:
     params = {"db": "pubmed", "term": term, "retmode": "json",
               "sort": "pub+date", "retmax": retmax}
-    r = requests.get(f"{PUBMED}/esearch.fcgi", params=params, timeout=20)
+    r = _SESSION.get(f"{PUBMED}/esearch.fcgi", params=params, timeout=20)
     r.raise_for_status()
     return r.json()["esearchresult"]["idlist"]
 
@@ -32,6 +57,8 @@ import requests, urllib.parse
 CTGOV = "https://clinicaltrials.gov/api/v2/studies"
 
 # --- utils ------------------------------------------------------------
+_INTR_SPLIT = re.compile(r"[;,]")
+
 ALLOWED_STATUS = {
     "NOT_YET_RECRUITING", "RECRUITING", "ACTIVE",
     "COMPLETED", "SUSPENDED", "TERMINATED", "WITHDRAWN"
@@ -62,7 +89,7 @@ def _build_params(
 
     if interventions_name:
         intr = " AND ".join(
-            seg.strip() for seg in re.split(r"[;,]", interventions_name) if seg.strip()
+            seg.strip() for seg in _INTR_SPLIT.split(interventions_name) if seg.strip()
         )
         params["query.intr"] = intr
 
@@ -101,7 +128,7 @@ def ctgov_search(
             page_size=page_size,
             page_token=token
         )
-        r = requests.get(CTGOV, params=params, timeout=30)
+        r = _SESSION.get(CTGOV, params=params, timeout=30)
         r.raise_for_status()
         data = r.json()
         studies.extend(data.get("studies", []))
@@ -114,45 +141,123 @@ def ctgov_search(
         for s in studies
     ]
 
+
+async def ctgov_search_async(
+    conditions: str | None = None,
+    startDateFrom: str | None = None,
+    overallStatus: str | None = None,
+    interventions_name: str | None = None,
+    locations_country: str | None = None,
+    page_size: int = 100
+) -> list[str]:
+    """Async ctgov_search over a single keep-alive httpx client.
+
+    CT.gov v2 pagination is token-chained (each page needs the previous
+    page's nextPageToken), so pages are still fetched in order, but all
+    of them ride one warm connection — HTTP/2 when the 'h2' extra is
+    installed — and the event loop stays free for other work.
+    """
+    if httpx is None:
+        raise RuntimeError("httpx is not installed; use ctgov_search instead.")
+    try:
+        client = httpx.AsyncClient(http2=True, timeout=30)
+    except ImportError:  # http2 extra not installed
+        client = httpx.AsyncClient(timeout=30)
+
+    studies, token = [], None
+    async with client:
+        while True:
+            params = _build_params(
+                conditions=conditions,
+                startDateFrom=startDateFrom,
+                overallStatus=overallStatus,
+                interventions_name=interventions_name,
+                locations_country=locations_country,
+                page_size=page_size,
+                page_token=token
+            )
+            r = await client.get(CTGOV, params=params)
+            r.raise_for_status()
+            data = r.json()
+            studies.extend(data.get("studies", []))
+            token = data.get("nextPageToken")
+            if not token:
+                break
+
+    return [
+        s["protocolSection"]["identificationModule"]["nctId"]
+        for s in studies
+    ]
+
 # ───────────────────────────────────────────
 # 3) OpenTargets
 # ───────────────────────────────────────────
 OT_URL = "https://api.platform.opentargets.org/api/v4/graphql"
 
-def _ot_query(query: str) -> Dict:
-    r = requests.post(OT_URL, json={"query": query}, timeout=20)
+# Queries are fixed shapes with $variables: user input never gets spliced
+# into the query text, and the OT platform can cache the query plan.
+_OT_ASSOCIATED_DISEASES_Q = """
+query associatedDiseases($targetId: String!, $size: Int!) {
+  target(ensemblId: $targetId) {
+    associatedDiseases(page: { index: 0, size: $size }) {
+      rows { disease { id name } score }
+    }
+  }
+}
+"""
+
+_OT_TRACTABILITY_Q = """
+query tractability($targetId: String!) {
+  target(ensemblId: $targetId) {
+    tractability { modality label value }
+  }
+}
+"""
+
+_OT_SEARCH_Q = """
+query search($queryString: String!) {
+  search(queryString: $queryString) {
+    hits { id entity description }
+  }
+}
+"""
+
+_OT_SAFETY_Q = """
+query safety($targetId: String!) {
+  target(ensemblId: $targetId) {
+    safetyLiabilities {
+      event
+      biosamples { tissueLabel tissueId }
+      effects { dosing direction }
+    }
+  }
+}
+"""
+
+def _ot_query(query: str, variables: Optional[Dict[str, Any]] = None) -> Dict:
+    # Normalize variables to a hashable tuple so the cache key covers them.
+    return _ot_query_cached(query, tuple(sorted((variables or {}).items())))
+
+@functools.lru_cache(maxsize=4096)
+def _ot_query_cached(query: str, var_items: Tuple[Tuple[str, Any], ...]) -> Dict:
+    r = _SESSION.post(OT_URL, json={"query": query, "variables": dict(var_items)}, timeout=20)
     r.raise_for_status()
     return r.json()["data"]
 
-def ot_associated_diseases(target_id: str, min_score: float = 0.5) -> List[Dict]:
-    q = f"""
-    {{ target(ensemblId: "{target_id}") {{
-        associatedDiseases {{ rows {{ disease {{id name}} score }} }} }} }}
-    """
-    rows = _ot_query(q)["target"]["associatedDiseases"]["rows"]
+def ot_associated_diseases(target_id: str, min_score: float = 0.5, size: int = 50) -> List[Dict]:
+    # Rows come back sorted by score desc, so asking for the top `size`
+    # server-side bounds the payload; min_score then trims the small tail.
+    rows = _ot_query(
+        _OT_ASSOCIATED_DISEASES_Q, {"targetId": target_id, "size": size}
+    )["target"]["associatedDiseases"]["rows"]
     return [r for r in rows if r["score"] >= min_score]
 
 def ot_tractability(target_id: str, value: bool = True) -> List[Dict]:
-    q = f"""
-    {{ target(ensemblId: "{target_id}") {{
-        tractability {{ modality label value }} }} }}
-    """
-    rows = _ot_query(q)["target"]["tractability"]
+    rows = _ot_query(_OT_TRACTABILITY_Q, {"targetId": target_id})["target"]["tractability"]
     return [r for r in rows if r["value"] is value]
 
 def ot_safety(symbol: str, event: str) -> Dict:
-    search_q = f'''
-    {{
-      search(queryString: "{symbol}") {{
-        hits {{
-          id
-          entity
-          description
-        }}
-      }}
-    }}
-    '''
-    search_data = _ot_query(search_q)["search"]["hits"]
+    search_data = _ot_query(_OT_SEARCH_Q, {"queryString": symbol})["search"]["hits"]
     target_id = None
     for hit in search_data:
         if hit["entity"] == "target":
@@ -160,19 +265,8 @@ def ot_safety(symbol: str, event: str) -> Dict:
             break
     if not target_id:
         return {}
-    
-    safety_q = f'''
-    {{
-      target(ensemblId: "{target_id}") {{
-        safetyLiabilities {{
-          event
-          biosamples {{ tissueLabel tissueId }}
-          effects {{ dosing direction }}
-        }}
-      }}
-    }}
-    '''
-    rows = _ot_query(safety_q)["target"]["safetyLiabilities"]
+
+    rows = _ot_query(_OT_SAFETY_Q, {"targetId": target_id})["target"]["safetyLiabilities"]
     for r in rows:
         if r["event"].lower() == event.lower():
             return {"biosamples": r["biosamples"], "effects": r["effects"]}
@@ -195,31 +289,82 @@ if pymysql is not None:
     DB_CFG["cursorclass"] = pymysql.cursors.DictCursor
 
 
-_conn = None  # lazy, typed at runtime
+_conn = None  # lazy fallback when DBUtils is unavailable
+_pool = None  # lazy PooledDB instance
+_indexes_ensured = False
 
-def _get_conn():
-    global _conn
-    if _conn is not None:
-        return _conn
+def ensure_indexes(conn) -> None:
+    """Create the covering index for name lookups, if it doesn't exist.
+
+    MySQL has no CREATE INDEX IF NOT EXISTS, so information_schema is
+    checked first. Best-effort: read-only DB users just skip it and the
+    queries fall back to whatever indexes the load script created.
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT 1 FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = 'MRCONSO' "
+                "AND index_name = 'idx_mrconso_lat_cui_tty' LIMIT 1")
+            if cur.fetchone():
+                return
+            cur.execute(
+                "CREATE INDEX idx_mrconso_lat_cui_tty "
+                "ON MRCONSO (LAT, CUI, TTY, STR(255))")
+    except Exception:
+        pass
+
+def _check_db_env() -> None:
     if pymysql is None:
         raise RuntimeError("pymysql is not installed; UMLS functions are unavailable. Install 'pymysql' or skip these tools.")
     # Basic env validation to avoid confusing errors
     missing = [k for k in ("UMLS_DB_USER", "UMLS_DB_PASSWORD") if not os.getenv(k)]
     if missing:
         raise RuntimeError(f"Missing required env vars for UMLS DB: {', '.join(missing)}")
-    _conn = pymysql.connect(**DB_CFG)
-    return _conn
 
-def umls_concept_lookup(name: str) -> str:
+def _get_conn():
+    """Return a DB connection, from a DBUtils pool when available.
+
+    A pool lets concurrent UMLS lookups (e.g. threaded batch callers)
+    each hold their own connection, and replaces connections that MySQL
+    dropped at idle timeout. Without DBUtils the old single shared
+    connection is used. Pooled connections are returned via close() in
+    _db_cursor; the fallback connection is kept open for the process.
+    """
+    global _conn, _pool, _indexes_ensured
+    _check_db_env()
+    if PooledDB is not None:
+        if _pool is None:
+            _pool = PooledDB(creator=pymysql, mincached=2, maxcached=8,
+                             maxconnections=32, **DB_CFG)
+        conn = _pool.connection()
+    else:
+        if _conn is None:
+            _conn = pymysql.connect(**DB_CFG)
+        conn = _conn
+    if not _indexes_ensured:
+        _indexes_ensured = True
+        ensure_indexes(conn)
+    return conn
+
+@contextmanager
+def _db_cursor():
     conn = _get_conn()
-    with conn.cursor() as cur:
+    try:
+        with conn.cursor() as cur:
+            yield cur
+    finally:
+        if _pool is not None:
+            conn.close()  # return to pool
+
+def umls_concept_lookup(name: str) -> str:
+    with _db_cursor() as cur:
         cur.execute("SELECT cui FROM concepts WHERE STR = %s LIMIT 1", (name,))
         row = cur.fetchone()
         return row["cui"] if row else ""
 
 def umls_get_related(from_cui: str, rela: str) -> List[str]:
-    conn = _get_conn()
-    with conn.cursor() as cur:
+    with _db_cursor() as cur:
         cur.execute(
             "SELECT cui1 FROM MRREL WHERE cui2=%s AND rela=%s",
             (from_cui, rela))
@@ -229,25 +374,54 @@ def umls_cui_to_name(cui: str) -> str:
     """
     输入CUI，返回英文名，优先PF/PT类型，否则任选一个。
     """
+    # TTY preference is pushed into SQL so the DB stops after one index
+    # seek on (LAT, CUI, TTY) instead of returning every synonym row.
     sql = """
-        SELECT STR, TTY
+        SELECT STR
         FROM   MRCONSO
         WHERE  LAT='ENG' AND CUI=%s
+        ORDER BY FIELD(TTY,'PF','PT') DESC
+        LIMIT 1
     """
-    conn = _get_conn()
-    with conn.cursor() as cur:
+    with _db_cursor() as cur:
         cur.execute(sql, (cui,))
-        names = []
-        pfpt = None
+        row = cur.fetchone()
+        return row["STR"] if row else ""
+
+def umls_cui_to_names(cuis: List[str]) -> Dict[str, str]:
+    """Batched umls_cui_to_name: one round-trip for N CUIs, returns {cui: name}."""
+    if not cuis:
+        return {}
+    placeholders = ",".join(["%s"] * len(cuis))
+    sql = f"""
+        SELECT CUI, STR, TTY
+        FROM   MRCONSO
+        WHERE  LAT='ENG' AND CUI IN ({placeholders})
+    """
+    with _db_cursor() as cur:
+        cur.execute(sql, list(cuis))
+        first: Dict[str, str] = {}
+        pfpt: Dict[str, str] = {}
+        for row in cur.fetchall():
+            cui = row["CUI"]
+            first.setdefault(cui, row["STR"])
+            if row["TTY"] in ("PF", "PT") and cui not in pfpt:
+                pfpt[cui] = row["STR"]
+    return {cui: pfpt.get(cui, first.get(cui, "")) for cui in cuis}
+
+def umls_get_relateds(from_cuis: List[str], rela: str) -> Dict[str, List[str]]:
+    """Batched umls_get_related: one round-trip, returns {from_cui: [cui1, ...]}."""
+    if not from_cuis:
+        return {}
+    placeholders = ",".join(["%s"] * len(from_cuis))
+    with _db_cursor() as cur:
+        cur.execute(
+            f"SELECT cui1, cui2 FROM MRREL WHERE cui2 IN ({placeholders}) AND rela=%s",
+            list(from_cuis) + [rela])
+        related: Dict[str, List[str]] = {cui: [] for cui in from_cuis}
         for row in cur.fetchall():
-            names.append(row["STR"])
-            if row["TTY"] in ("PF", "PT"):
-                pfpt = row["STR"]
-        if pfpt:
-            return pfpt
-        if names:
-            return names[0]
-        return ""
+            related[row["cui2"]].append(row["cui1"])
+        return related
 
 # ───────────────────────────────────────────
 # 5) Guideline path
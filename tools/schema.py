@@ -1,6 +1,45 @@
 # tools/schema.py
 # JSON schema（Python 字典形式），可直接传给 chat.completions.create tools 参数
-pubmed_schema = {
+import re
+import sys
+from types import MappingProxyType
+
+_i = sys.intern
+
+
+def _freeze(d):
+    """Recursively wrap a schema dict in read-only MappingProxyType.
+
+    Frozen schemas cannot drift after import, so id(schema) is a stable
+    validator-cache key and the hot path needs no canonical-JSON dump.
+    Strings are interned along the way: recurring keys and values
+    ("type", "properties", "string", ...) collapse to one object each
+    across the 11 schemas, and dict probes on them hit CPython's
+    identity fast path before falling back to __eq__.
+    """
+    return MappingProxyType({
+        _i(k): _freeze(v) if isinstance(v, dict)
+        else tuple(_i(x) if isinstance(x, str) else x for x in v) if isinstance(v, list)
+        else _i(v) if isinstance(v, str)
+        else v
+        for k, v in d.items()
+    })
+
+
+def to_plain(obj):
+    """Recursively convert a frozen schema back to plain dicts/lists.
+
+    Needed wherever the schema is JSON-serialized (API request bodies,
+    validator compilation): MappingProxyType is not serializable.
+    """
+    if isinstance(obj, (dict, MappingProxyType)):
+        return {k: to_plain(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_plain(v) for v in obj]
+    return obj
+
+
+pubmed_schema = _freeze({
     "name": "pubmed.search",
     "description": "Search PubMed and return a list of PMIDs.",
     "parameters": {
@@ -9,11 +48,12 @@ pubmed_schema = {
             "term":    {"type": "string"},
             "retmax":  {"type": "integer", "default": 10}
         },
-        "required": ["term"]
+        "required": ["term"],
+        "additionalProperties": False
     }
-}
+})
 
-ctgov_schema = {
+ctgov_schema = _freeze({
     "name": "ctgov.search",
     "description": "Search ClinicalTrials.gov v2 and return matching NCT IDs.",
     "parameters": {
@@ -54,18 +94,40 @@ ctgov_schema = {
         },
     "additionalProperties": False
     }
-}
+})
+
+# Hash-based membership for the pre-validation fast path; the schema's
+# `enum` remains a JSON array in the serialized schema.
+CTGOV_OVERALL_STATUS = frozenset(
+    ctgov_schema["parameters"]["properties"]["overallStatus"]["enum"]
+)
+
+# Compiled once at import; interpretive validators would otherwise
+# recompile the startDateFrom pattern on every validate call.
+_DATE_RE = re.compile(
+    ctgov_schema["parameters"]["properties"]["startDateFrom"]["pattern"]
+)
+
+
+def _alias(base, new_name):
+    """Alias a schema under another tool name, sharing its `parameters`.
+
+    Sharing (not copying) the parameters dict means downstream validator
+    caches keyed on the subtree's identity hold a single compiled entry
+    per semantic schema, not one per alias.
+    """
+    return MappingProxyType(
+        {"name": new_name, "description": base["description"], "parameters": base["parameters"]}
+    )
+
 
 # Backward-compatible alias (previous name used underscore style)
-ctgov_schema_legacy = {
-    **ctgov_schema,
-    "name": "ctgov_search",
-}
+ctgov_schema_legacy = _alias(ctgov_schema, "ctgov_search")
 
 
 
 
-ot_search_schema = {
+ot_search_schema = _freeze({
     "name": "opentargets.associated_diseases",
     "description": "Return diseases associated with a target (with score cutoff).",
     "parameters": {
@@ -74,17 +136,15 @@ ot_search_schema = {
             "target_id": {"type": "string"},
             "min_score": {"type": "number", "default": 0.5}
         },
-        "required": ["target_id"]
+        "required": ["target_id"],
+        "additionalProperties": False
     }
-}
+})
 
 # Legacy alias to preserve older tool name
-ot_search_schema_legacy = {
-    **ot_search_schema,
-    "name": "opentargets.search",
-}
+ot_search_schema_legacy = _alias(ot_search_schema, "opentargets.search")
 
-ot_tract_schema = {
+ot_tract_schema = _freeze({
     "name": "opentargets.tractability",
     "description": "Return tractability modalities with value==True/False.",
     "parameters": {
@@ -93,11 +153,12 @@ ot_tract_schema = {
             "target_id": {"type": "string"},
             "value":     {"type": "boolean", "default": True}
         },
-        "required": ["target_id"]
+        "required": ["target_id"],
+        "additionalProperties": False
     }
-}
+})
 
-ot_safety_schema = {
+ot_safety_schema = _freeze({
     "name": "opentargets.safety",
     "description": "Return biosamples & effects for a given safety event.",
     "parameters": {
@@ -106,11 +167,12 @@ ot_safety_schema = {
             "symbol": {"type": "string"},
             "event":  {"type": "string"}
         },
-        "required": ["symbol", "event"]
+        "required": ["symbol", "event"],
+        "additionalProperties": False
     }
-}
+})
 
-umls_lookup_schema = {
+umls_lookup_schema = _freeze({
     "name": "umls.concept_lookup",
     "description": "Return the CUI for a given concept name.",
     "parameters": {
@@ -118,11 +180,12 @@ umls_lookup_schema = {
         "properties": {
             "name": {"type": "string"}
         },
-        "required": ["name"]
+        "required": ["name"],
+        "additionalProperties": False
     }
-}
+})
 
-umls_related_schema = {
+umls_related_schema = _freeze({
     "name": "umls.get_related",
     "description": "Return CUIs related by a specified rela.",
     "parameters": {
@@ -131,11 +194,12 @@ umls_related_schema = {
             "from_cui": {"type": "string"},
             "rela":     {"type": "string"}
         },
-        "required": ["from_cui", "rela"]
+        "required": ["from_cui", "rela"],
+        "additionalProperties": False
     }
-}
+})
 
-umls_cui_to_name_schema = {
+umls_cui_to_name_schema = _freeze({
     "name": "umls.cui_to_name",
     "description": "Return the English name (STR, PF/PT preferred) for a given CUI.",
     "parameters": {
@@ -143,12 +207,13 @@ umls_cui_to_name_schema = {
         "properties": {
             "cui": {"type": "string"}
         },
-        "required": ["cui"]
+        "required": ["cui"],
+        "additionalProperties": False
     }
-}
+})
 
 
-onco_path_schema = {
+onco_path_schema = _freeze({
     "name": "oncology.path_query",
     "description": "Return guideline nodes supplied by params.",
     "parameters": {
@@ -156,13 +221,382 @@ onco_path_schema = {
         "properties": {
             "nodes": {"type": "array", "items": {"type": "string"}}
         },
-        "required": ["nodes"]
+        "required": ["nodes"],
+        "additionalProperties": False
     }
-}
+})
 
-ALL_SCHEMAS = [
+# A flat constant: frozen schemas in an immutable tuple, safe to share
+# with id()-keyed caches and slightly tighter to iterate than a list.
+ALL_SCHEMAS = (
     pubmed_schema, ctgov_schema, ctgov_schema_legacy,
     ot_search_schema, ot_search_schema_legacy, ot_tract_schema, ot_safety_schema,
     umls_lookup_schema, umls_related_schema, umls_cui_to_name_schema,
     onco_path_schema
-]
+)
+
+
+# ── Precompiled argument validators ─────────────────────────
+# fastjsonschema code-generates one plain Python function per schema at
+# import (~2 orders faster per call than interpretive jsonschema on the
+# valid path, including the startDateFrom regex which it compiles into
+# its pattern cache). Interpretive jsonschema is kept as fallback, with
+# its Draft validator likewise built once here rather than per call.
+import json as _json
+
+# Validators pregenerated by tools/_gen_schema_validators.py, if that
+# has been run: importing straight-line code beats recompiling every
+# schema at process start.
+try:
+    from ._schema_validators import VALIDATORS as _pregenerated  # type: ignore
+except Exception:  # pragma: no cover - generated at build time
+    _pregenerated = None  # type: ignore
+try:
+    import fastjsonschema as _fastjsonschema  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    _fastjsonschema = None  # type: ignore
+try:
+    from jsonschema import validators as _jsonschema_validators  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    _jsonschema_validators = None  # type: ignore
+
+# Validators cached two ways: frozen module schemas by id() (stable since
+# they are immutable, and skips JSON serialization on the hot path), and
+# plain user-constructed schemas by canonical JSON so semantically equal
+# schemas — e.g. composites built downstream from pieces of these —
+# compile exactly once.
+_VCACHE = {}
+_VCACHE_BY_ID = {}
+
+
+def _compile_schema(schema):
+    if _fastjsonschema is not None:
+        # Route "date" format checks through the precompiled matcher so
+        # the generated code shares it instead of compiling its own.
+        return _fastjsonschema.compile(schema, formats={"date": _DATE_RE.match})
+    if _jsonschema_validators is not None:
+        cls = _jsonschema_validators.validator_for(schema)
+        cls.check_schema(schema)
+        return cls(schema).validate
+    return None
+
+
+def get_validator(schema):
+    """Return a compiled validator callable for *schema*, or None.
+
+    Frozen schemas hit an id()-keyed cache with no serialization; plain
+    dicts are cached on ``json.dumps(schema, sort_keys=True)`` so
+    user-constructed schemas equal to an ``ALL_SCHEMAS`` entry reuse its
+    compiled function.
+    """
+    if isinstance(schema, MappingProxyType):
+        validator = _VCACHE_BY_ID.get(id(schema))
+        if validator is None:
+            validator = _compile_schema(to_plain(schema))
+            if validator is not None:
+                _VCACHE_BY_ID[id(schema)] = validator
+        return validator
+    key = _json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    validator = _VCACHE.get(key)
+    if validator is None:
+        validator = _compile_schema(schema)
+        if validator is not None:
+            _VCACHE[key] = validator
+    return validator
+
+
+if _pregenerated is not None:
+    # Seed the id()-keyed cache so get_validator serves the pregenerated
+    # functions instead of compiling at import.
+    for _s in ALL_SCHEMAS:
+        _v = _pregenerated.get(_s["name"])
+        if _v is not None:
+            _VCACHE_BY_ID.setdefault(id(_s["parameters"]), _v)
+
+_VALIDATORS = {_s["name"]: get_validator(_s["parameters"]) for _s in ALL_SCHEMAS}
+
+# Plain-dict copies for call sites that JSON-serialize the schemas
+# (e.g. the tools= parameter of chat.completions.create).
+ALL_SCHEMAS_PLAIN = [to_plain(_s) for _s in ALL_SCHEMAS]
+
+try:
+    import orjson as _orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    _orjson = None  # type: ignore
+
+# The OpenAI tools wrapper, built once: re-wrapping and re-serializing
+# static schemas on every chat.completions.create call is wasted CPU.
+# TOOLS_PAYLOAD_JSON holds the serialized bytes so callers assembling
+# raw request bodies can splice the tools block without re-encoding.
+TOOLS_PAYLOAD = [{"type": "function", "function": _s} for _s in ALL_SCHEMAS_PLAIN]
+TOOLS_PAYLOAD_JSON = (
+    _orjson.dumps(TOOLS_PAYLOAD)
+    if _orjson is not None
+    else _json.dumps(TOOLS_PAYLOAD, separators=(",", ":")).encode()
+)
+
+
+# ── Optional Pydantic v2 backend ────────────────────────────
+# pydantic-core validates in compiled Rust, which beats any Python-level
+# jsonschema implementation on these tiny argument shapes. The dict
+# schemas above stay the source of truth for the tools payload; the
+# models mirror them and are used for validation only when available.
+try:
+    from pydantic import BaseModel as _BaseModel  # type: ignore
+    from pydantic import ConfigDict as _ConfigDict  # type: ignore
+    from pydantic import Field as _Field  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    _BaseModel = None  # type: ignore
+
+_MODEL_VALIDATORS = {}
+if _BaseModel is not None:
+    from typing import List as _TList
+    from typing import Literal as _TLiteral
+    from typing import Optional as _TOpt
+
+    class _Args(_BaseModel):
+        # Schemas are closed objects (additionalProperties: False).
+        model_config = _ConfigDict(extra="forbid")
+
+    class _PubmedSearch(_Args):
+        term: str
+        retmax: int = 10
+
+    class _CtgovSearch(_Args):
+        conditions: _TOpt[str] = None
+        startDateFrom: _TOpt[str] = _Field(None, pattern=r"^\d{4}-\d{2}-\d{2}$")
+        overallStatus: _TOpt[_TLiteral[
+            "NOT_YET_RECRUITING", "RECRUITING", "ACTIVE",
+            "COMPLETED", "SUSPENDED", "TERMINATED", "WITHDRAWN",
+        ]] = None
+        interventions_name: _TOpt[str] = None
+        locations_country: _TOpt[str] = None
+        page_size: int = _Field(100, ge=1, le=100)
+
+    class _OtAssociatedDiseases(_Args):
+        target_id: str
+        min_score: float = 0.5
+
+    class _OtTractability(_Args):
+        target_id: str
+        value: bool = True
+
+    class _OtSafety(_Args):
+        symbol: str
+        event: str
+
+    class _UmlsConceptLookup(_Args):
+        name: str
+
+    class _UmlsGetRelated(_Args):
+        from_cui: str
+        rela: str
+
+    class _UmlsCuiToName(_Args):
+        cui: str
+
+    class _OncoPathQuery(_Args):
+        nodes: _TList[str]
+
+    _MODEL_VALIDATORS = {
+        "pubmed.search": _PubmedSearch.model_validate,
+        "ctgov.search": _CtgovSearch.model_validate,
+        "ctgov_search": _CtgovSearch.model_validate,
+        "opentargets.associated_diseases": _OtAssociatedDiseases.model_validate,
+        "opentargets.search": _OtAssociatedDiseases.model_validate,
+        "opentargets.tractability": _OtTractability.model_validate,
+        "opentargets.safety": _OtSafety.model_validate,
+        "umls.concept_lookup": _UmlsConceptLookup.model_validate,
+        "umls.get_related": _UmlsGetRelated.model_validate,
+        "umls.cui_to_name": _UmlsCuiToName.model_validate,
+        "oncology.path_query": _OncoPathQuery.model_validate,
+    }
+
+
+# ── Optional msgspec backend ────────────────────────────────
+# Same rung as the Pydantic models but with lower per-call overhead:
+# msgspec decodes and validates raw JSON in one Rust/C pass with no
+# model-instance allocation, which suits short-lived tool calls. The
+# Structs mirror the dict schemas, which remain the source of truth.
+try:
+    import msgspec as _msgspec  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    _msgspec = None  # type: ignore
+
+_STRUCT_VALIDATORS = {}
+_STRUCT_DECODERS = {}
+if _msgspec is not None:
+    import functools as _functools
+    from typing import Annotated as _TAnn
+    from typing import List as _TList2
+    from typing import Literal as _TLiteral2
+    from typing import Optional as _TOpt2
+
+    class _PubmedArgs(_msgspec.Struct, frozen=True, forbid_unknown_fields=True):
+        term: str
+        retmax: int = 10
+
+    class _CtgovArgs(_msgspec.Struct, frozen=True, forbid_unknown_fields=True):
+        conditions: _TOpt2[str] = None
+        startDateFrom: _TOpt2[_TAnn[str, _msgspec.Meta(pattern=r"^\d{4}-\d{2}-\d{2}$")]] = None
+        overallStatus: _TOpt2[_TLiteral2[
+            "NOT_YET_RECRUITING", "RECRUITING", "ACTIVE",
+            "COMPLETED", "SUSPENDED", "TERMINATED", "WITHDRAWN",
+        ]] = None
+        interventions_name: _TOpt2[str] = None
+        locations_country: _TOpt2[str] = None
+        page_size: _TAnn[int, _msgspec.Meta(ge=1, le=100)] = 100
+
+    class _OtAssociatedDiseasesArgs(_msgspec.Struct, frozen=True, forbid_unknown_fields=True):
+        target_id: str
+        min_score: float = 0.5
+
+    class _OtTractabilityArgs(_msgspec.Struct, frozen=True, forbid_unknown_fields=True):
+        target_id: str
+        value: bool = True
+
+    class _OtSafetyArgs(_msgspec.Struct, frozen=True, forbid_unknown_fields=True):
+        symbol: str
+        event: str
+
+    class _UmlsConceptLookupArgs(_msgspec.Struct, frozen=True, forbid_unknown_fields=True):
+        name: str
+
+    class _UmlsGetRelatedArgs(_msgspec.Struct, frozen=True, forbid_unknown_fields=True):
+        from_cui: str
+        rela: str
+
+    class _UmlsCuiToNameArgs(_msgspec.Struct, frozen=True, forbid_unknown_fields=True):
+        cui: str
+
+    class _OncoPathQueryArgs(_msgspec.Struct, frozen=True, forbid_unknown_fields=True):
+        nodes: _TList2[str]
+
+    _STRUCT_TYPES = {
+        "pubmed.search": _PubmedArgs,
+        "ctgov.search": _CtgovArgs,
+        "ctgov_search": _CtgovArgs,
+        "opentargets.associated_diseases": _OtAssociatedDiseasesArgs,
+        "opentargets.search": _OtAssociatedDiseasesArgs,
+        "opentargets.tractability": _OtTractabilityArgs,
+        "opentargets.safety": _OtSafetyArgs,
+        "umls.concept_lookup": _UmlsConceptLookupArgs,
+        "umls.get_related": _UmlsGetRelatedArgs,
+        "umls.cui_to_name": _UmlsCuiToNameArgs,
+        "oncology.path_query": _OncoPathQueryArgs,
+    }
+    _STRUCT_VALIDATORS = {
+        _n: _functools.partial(_msgspec.convert, type=_t)
+        for _n, _t in _STRUCT_TYPES.items()
+    }
+    # One decoder per struct, built once: decoder.decode(raw) parses
+    # and validates in a single pass, no intermediate dict.
+    _STRUCT_DECODERS = {
+        _n: _msgspec.json.Decoder(_t).decode for _n, _t in _STRUCT_TYPES.items()
+    }
+
+
+def decode_args(name, raw):
+    """Parse raw JSON tool-call arguments, validating when possible.
+
+    With msgspec installed this is one decode+validate pass over the
+    bytes; otherwise the payload is parsed normally and run through
+    validate_args. Returns a plain dict either way.
+    """
+    decoder = _STRUCT_DECODERS.get(name)
+    if decoder is not None:
+        return _msgspec.to_builtins(decoder(raw))
+    data = _orjson.loads(raw) if _orjson is not None else _json.loads(raw)
+    validate_args(name, data)
+    return data
+
+
+# ── External compiled validator backend ─────────────────────
+# Python validators are fine for tiny tool-arg dicts but become the
+# bottleneck on document-sized payloads (PubMed result batches,
+# ClinicalTrials pages). When a compiled CLI validator (blaze or ajv)
+# is on PATH, payloads above the threshold are piped to it instead.
+import shutil as _shutil
+import subprocess as _subprocess
+from pathlib import Path as _Path
+
+_EXTERNAL_VALIDATOR = _shutil.which("blaze") or _shutil.which("ajv")
+_EXTERNAL_THRESHOLD = 64 * 1024  # serialized bytes
+_SCHEMA_JSON_DIR = _Path(__file__).with_name("_schema_json")
+_SCHEMA_JSON_PATHS = {}
+
+
+def _dump_bytes(obj):
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return _json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _schema_json_path(name):
+    """Materialize the named schema's parameters as a JSON file, once."""
+    path = _SCHEMA_JSON_PATHS.get(name)
+    if path is None:
+        _SCHEMA_JSON_DIR.mkdir(exist_ok=True)
+        slug = re.sub(r"[^0-9A-Za-z]+", "_", name).strip("_").lower()
+        path = _SCHEMA_JSON_DIR / f"{slug}.json"
+        path.write_bytes(_dump_bytes(to_plain(SCHEMAS_BY_NAME[name]["parameters"])))
+        _SCHEMA_JSON_PATHS[name] = path
+    return path
+
+
+def _validate_external(name, payload):
+    schema_path = str(_schema_json_path(name))
+    if _EXTERNAL_VALIDATOR.endswith("ajv"):
+        cmd = [_EXTERNAL_VALIDATOR, "validate", "-s", schema_path, "-d", "/dev/stdin"]
+    else:
+        cmd = [_EXTERNAL_VALIDATOR, "validate", schema_path]
+    proc = _subprocess.run(cmd, input=payload, capture_output=True)
+    if proc.returncode != 0:
+        detail = (proc.stderr or proc.stdout).decode(errors="replace").strip()
+        raise ValueError(f"{name}: external validation failed: {detail}")
+
+
+# O(1) dispatch tables for tool-call routing: two hash lookups
+# (name → validator, name → schema) instead of scanning ALL_SCHEMAS.
+SCHEMAS_BY_NAME = {_s["name"]: _s for _s in ALL_SCHEMAS}
+VALIDATE_BY_NAME = {
+    _s["name"]: _STRUCT_VALIDATORS.get(_s["name"])
+    or _MODEL_VALIDATORS.get(_s["name"])
+    or _VALIDATORS.get(_s["name"])
+    for _s in ALL_SCHEMAS
+}
+
+
+def validate_args(name, data, *, backend="auto"):
+    """Validate tool-call arguments against the named schema.
+
+    Prefers the Rust-backed Pydantic models, then the callable compiled
+    at import; no-op when no validation backend is installed (the tools
+    themselves still type-check their inputs).
+
+    ``backend`` may be "auto" (default), "python", or "external".
+    Under "auto", payloads whose serialized size exceeds 64 KiB are
+    piped to a compiled CLI validator (blaze or ajv) when one is on
+    PATH; "external" forces that path, "python" never leaves process.
+    """
+    if name in ("ctgov.search", "ctgov_search"):
+        start = data.get("startDateFrom")
+        if start is not None and not _DATE_RE.match(start):
+            raise ValueError(
+                f"startDateFrom must be YYYY-MM-DD, got {start!r}"
+            )
+        status = data.get("overallStatus")
+        if status is not None and status not in CTGOV_OVERALL_STATUS:
+            # One hashed probe short-circuits the common invalid case
+            # before the full schema walk.
+            raise ValueError(
+                f"overallStatus must be one of {sorted(CTGOV_OVERALL_STATUS)}, got {status!r}"
+            )
+    if backend != "python" and _EXTERNAL_VALIDATOR is not None and name in SCHEMAS_BY_NAME:
+        payload = _dump_bytes(data)
+        if backend == "external" or len(payload) > _EXTERNAL_THRESHOLD:
+            _validate_external(name, payload)
+            return
+    validator = VALIDATE_BY_NAME.get(name)
+    if validator is not None:
+        validator(data)